@@ -28,36 +28,37 @@ class PipenFilters:
         if "globals" not in config.template_opts:
             config.template_opts.globals = {}
 
-        config.template_opts.filters = {
-            **FILTERS,
-            **config.template_opts.filters,
-        }
-        config.template_opts.globals = {
-            **FILTERS,
-            **config.template_opts.globals,
-        }
+        # Merge in place, user-defined filters/globals take precedence
+        filters = config.template_opts.filters
+        globs = config.template_opts.globals
+        for name, func in FILTERS.items():
+            filters.setdefault(name, func)
+            globs.setdefault(name, func)
+
+
+# The message format pipen uses to log the config items
+_CONFIG_LOG_MSG = "[bold][magenta]%-16s:[/magenta][/bold] %s"
+_CONFIG_LOG_MSG_SHORT = "[bold][magenta]%-16s:[/magenta][/bold] %.54s..."
 
 
 class TemplateOptsShortenFilter(logging.Filter):
     """Shorten the template opts in the log"""
 
     def filter(self, record: logging.LogRecord) -> bool:
-        if (
-            record.msg == "[bold][magenta]%-16s:[/magenta][/bold] %s"
-            and isinstance(record.args, tuple)
-            and len(record.args) == 2
-            and (
-                record.args[0] == "template_opts"
-                or (
-                    not record.args[0]
-                    and (
-                        isinstance(record.args[1], str)
-                        and record.args[1][:8] in ("filters=", "globals=")
-                    )
-                )
-            )
+        # Most records are not config items, let them pass with a single check
+        if record.msg != _CONFIG_LOG_MSG:
+            return True
+
+        args = record.args
+        if not isinstance(args, tuple) or len(args) != 2:
+            return True
+
+        if args[0] == "template_opts" or (
+            not args[0]
+            and isinstance(args[1], str)
+            and args[1][:8] in ("filters=", "globals=")
         ):
-            record.msg = "[bold][magenta]%-16s:[/magenta][/bold] %.54s..."
+            record.msg = _CONFIG_LOG_MSG_SHORT
         return True
 
 
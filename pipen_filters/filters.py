@@ -2,17 +2,50 @@
 from __future__ import annotations
 
 import json
-from glob import glob as pyglob
-from os import PathLike, path, readlink as os_readlink
+import re
+import sys
+from functools import lru_cache
+from fnmatch import translate as fnmatch_translate
+from glob import iglob as pyiglob
+from os import (
+    PathLike,
+    fspath,
+    path,
+    readlink as os_readlink,
+    scandir,
+    stat as os_stat,
+    stat_result,
+)
 from pathlib import Path
-from typing import Any, List, Mapping, Union, Dict, Callable
-
-import rtoml
-from diot import Diot
-from simpleconf import Config
-from simpleconf.caster import cast, null_caster
-
-FILTERS: Dict[str, Callable] = {}
+from stat import S_ISDIR, S_ISREG
+from string import ascii_letters, digits
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, List, Mapping, Union, Dict, Callable
+
+# Bound once to skip the attribute lookups in the filters called per row
+_basename = path.basename
+_dirname = path.dirname
+_join = path.join
+_realpath = path.realpath
+_splitext = path.splitext
+
+_FILTERS: Dict[str, Callable] = {}
+# Read-only view of the registered filters, use `add_filter` to add more
+FILTERS: Mapping[str, Callable] = MappingProxyType(_FILTERS)
+
+# Characters that need no escaping in either json or repr quoting
+_QUOTE_SAFE = frozenset(ascii_letters + digits + "_-./")
+# Characters that make a path a glob pattern
+_GLOB_MAGIC = frozenset("*?[")
+# Match file names case-insensitively where the filesystem does (Windows)
+_GLOB_FLAGS = re.IGNORECASE if path.normcase("A") == "a" else 0
+# Strings made of these are slugified by lowercasing and joining the words
+_SLUG_SIMPLE = frozenset(ascii_letters + digits + " \t\n\r")
+# Same output as json.dumps() with default arguments, minus the per-call
+# argument checks
+_json_encode = json.JSONEncoder().encode
+# Compiled regular expressions, keyed by (pattern, flags)
+_compile_re = lru_cache(maxsize=256)(re.compile)
 
 
 def add_filter(
@@ -50,23 +83,74 @@ def add_filter(
         aliases = [aliases]
 
     def _add_filter(func: Callable) -> Callable:
-        FILTERS[func.__name__] = func
+        _FILTERS[func.__name__] = func
         for alias in aliases:
-            FILTERS[alias] = func
+            _FILTERS[alias] = func
         return func
 
     return _add_filter
 
 
-def _neg1_if_error(func: Callable) -> Callable:
-    """Return -1 if an error occurs"""
-    def _func(*args: Any, **kwargs: Any) -> int:
-        try:
-            return func(*args, **kwargs)
-        except (FileNotFoundError, OSError):
-            return -1
+def _intern(string: str) -> str:
+    """Intern short strings, such as extensions and file names
+
+    They are likely to be compared or used as keys again in the templates.
+    Long strings are returned as is to keep the interned table small.
+    """
+    if isinstance(string, str) and len(string) <= 32:
+        return sys.intern(string)
+    return string
 
-    return _func
+
+def _stat(pth: PathLike) -> stat_result | None:
+    """Get the stat of a path, return None if the path cannot be stat'ed
+
+    The stat-derived filters share it, so that each of them does a single
+    syscall and no exception is raised for a missing file or an invalid
+    path (e.g. with an embedded null byte), like `os.path.exists()`.
+    """
+    try:
+        return os_stat(pth)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=128)
+def _norm_ignore(ignore: tuple[str, ...]) -> frozenset[str]:
+    """Normalize the extensions to ignore to a set with leading dots
+
+    Args:
+        ignore: The extensions to ignore, with or without leading dot
+
+    Returns:
+        The set of extensions with leading dots
+    """
+    return frozenset("." + ext.lstrip(".") for ext in ignore)
+
+
+@lru_cache(maxsize=8192)
+def _splitexit_cached(
+    pth: str,
+    ignore: tuple[str, ...],
+    recursive: bool,
+) -> tuple[str, str]:
+    """The cached implementation of `_splitexit`
+
+    The path is passed as a string and `ignore` as a tuple, so that the cache
+    is keyed on the exact path, not on objects that only compare equal (e.g.
+    `PureWindowsPath` compares case-insensitively)
+    """
+    if not ignore:
+        return _splitext(pth)
+
+    ignore = _norm_ignore(ignore)
+    pth, last = _splitext(pth)
+    if not recursive:
+        return (pth, last) if last not in ignore else _splitext(pth)
+
+    while last in ignore:
+        pth, last = _splitext(pth)
+    return pth, last
 
 
 def _splitexit(
@@ -85,16 +169,80 @@ def _splitexit(
     Returns:
         The path and the extension (with leading dot)
     """
-    if isinstance(ignore, str):
-        ignore = [ignore]
-    ignore = ["." + ext.lstrip(".") for ext in ignore]
-    pth, last = path.splitext(pth)
-    if not recursive:
-        return (pth, last) if last not in ignore else path.splitext(pth)
+    return _splitexit_cached(
+        fspath(pth),
+        (ignore,) if isinstance(ignore, str) else tuple(ignore),
+        recursive,
+    )
 
-    while last in ignore:
-        pth, last = path.splitext(pth)
-    return pth, last
+
+@lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> re.Pattern:
+    """Compile a glob pattern for a file name into a regular expression"""
+    return re.compile(fnmatch_translate(pattern), _GLOB_FLAGS)
+
+
+def _scandir_glob(dirpart: str, pattern: str) -> Iterator[str]:
+    """Match the entries of a directory against a glob pattern
+
+    Like `glob.iglob()`, hidden entries are only matched if the pattern
+    starts with a dot.
+
+    Args:
+        dirpart: The directory to scan, without glob characters
+        pattern: The glob pattern for the names of the entries
+
+    Yields:
+        The matched paths, joined with the directory
+    """
+    match = _compile_glob(pattern).match
+    hidden = pattern.startswith(".")
+    try:
+        with scandir(dirpart or ".") as entries:
+            for entry in entries:
+                name = entry.name
+                if (hidden or name[0] != ".") and match(name):
+                    yield _join(dirpart, name)
+    except OSError:
+        return
+
+
+def _iglob(pattern: str) -> Iterable[str]:
+    """Glob a pattern, avoiding `glob.iglob()` where possible
+
+    Args:
+        pattern: The pattern to glob
+
+    Returns:
+        The matched paths, unsorted
+    """
+    if not isinstance(pattern, str):
+        # bytes patterns, the fast paths below only handle str
+        return pyiglob(pattern)
+
+    if _GLOB_MAGIC.isdisjoint(pattern):
+        # A literal path, no need to scan the directory
+        return [pattern] if path.lexists(pattern) else []
+
+    dirpart, basepart = path.split(pattern)
+    if not _GLOB_MAGIC.isdisjoint(dirpart):
+        return pyiglob(pattern)
+    # Only the last part is a pattern, match it in a single scandir() pass
+    return _scandir_glob(dirpart, basepart)
+
+
+def clear_filter_caches() -> None:
+    """Clear the caches used by the filters
+
+    The caches only hold results of pure string operations (splitting
+    extensions, common prefixes, compiling regular expressions and glob
+    patterns), so this is only needed to release memory.
+    """
+    _splitexit_cached.cache_clear()
+    _norm_ignore.cache_clear()
+    _compile_re.cache_clear()
+    _commonprefix.cache_clear()
+    _compile_glob.cache_clear()
 
 
 @add_filter
@@ -107,7 +255,7 @@ def realpath(pth: PathLike) -> str:
     Returns:
         The real path of the file
     """
-    return path.realpath(pth)
+    return _realpath(pth)
 
 
 @add_filter
@@ -123,6 +271,17 @@ def readlink(pth: PathLike) -> str:
     return os_readlink(pth)
 
 
+@lru_cache(maxsize=256)
+def _commonprefix(paths: tuple[str, ...], basename_only: bool) -> str:
+    """The cached implementation of `commonprefix`, keyed on the path strings"""
+    if len(paths) == 1:
+        return _basename(paths[0]) if basename_only else paths[0]
+
+    if basename_only:
+        paths = tuple(_basename(pth) for pth in paths)
+    return path.commonprefix(paths)
+
+
 @add_filter
 def commonprefix(*paths: PathLike, basename_only: bool = True) -> str:
     """Get the common prefix of a set of paths
@@ -140,8 +299,7 @@ def commonprefix(*paths: PathLike, basename_only: bool = True) -> str:
     Returns:
         The common prefix of the paths
     """
-    paths = [path.basename(pth) if basename_only else pth for pth in paths]
-    return path.commonprefix(paths)
+    return _commonprefix(tuple(map(fspath, paths)), basename_only)
 
 
 @add_filter
@@ -156,7 +314,22 @@ def dirname(pth: PathLike) -> str:
     Returns:
         The directory name of the file
     """
-    return path.dirname(pth)
+    return _dirname(pth)
+
+
+@add_filter
+def dirnames(paths: Iterable[PathLike]) -> List[str]:
+    """Get the directory names of a list of paths
+
+    For example, `["/a/b/c.txt", "/a/d.txt"] => ["/a/b", "/a"]`
+
+    Args:
+        paths: The paths to the files
+
+    Returns:
+        The directory names of the files
+    """
+    return list(map(_dirname, paths))
 
 
 @add_filter
@@ -171,7 +344,22 @@ def basename(pth: PathLike) -> str:
     Returns:
         The basename of the file
     """
-    return path.basename(pth)
+    return _intern(_basename(pth))
+
+
+@add_filter
+def basenames(paths: Iterable[PathLike]) -> List[str]:
+    """Get the basenames of a list of paths
+
+    For example, `["/a/b/c.txt", "/a/d.txt"] => ["c.txt", "d.txt"]`
+
+    Args:
+        paths: The paths to the files
+
+    Returns:
+        The basenames of the files
+    """
+    return [_intern(_basename(pth)) for pth in paths]
 
 
 @add_filter("suffix")
@@ -191,7 +379,7 @@ def ext(pth: PathLike, ignore: list[str] | str = [], recursive: bool = False) ->
     Returns:
         The extension of the file
     """
-    return _splitexit(pth, ignore, recursive)[1]
+    return _intern(_splitexit(pth, ignore, recursive)[1])
 
 
 @add_filter("suffix0")
@@ -211,7 +399,31 @@ def ext0(pth: PathLike, ignore: list[str] | str = [], recursive: bool = False) -
     Returns:
         The extension of the file without the leading dot
     """
-    return ext(pth, ignore, recursive)[1:]
+    return _splitexit(pth, ignore, recursive)[1][1:]
+
+
+@add_filter("suffixes")
+def exts(
+    paths: Iterable[PathLike],
+    ignore: list[str] | str = [],
+    recursive: bool = False,
+) -> List[str]:
+    """Get the extensions of a list of files
+
+    For example, `["/a/b/c.txt", "/a/d.csv"] => [".txt", ".csv"]`.
+
+    Aliases: `suffixes`
+
+    Args:
+        paths: The paths to the files
+        ignore: The extensions to ignore
+            The extensions can be with or without leading dot
+        recursive: Recursively ignore the extensions from the end
+
+    Returns:
+        The extensions of the files
+    """
+    return [ext(pth, ignore, recursive) for pth in paths]
 
 
 @add_filter
@@ -247,7 +459,7 @@ def prefix0(pth: PathLike, ignore: list[str] | str = [], recursive: bool = False
     Returns:
         The prefix of the file without the extension
     """
-    return path.join(path.dirname(pth), FILTERS["filename0"](pth, ignore, recursive))
+    return _join(_dirname(pth), filename0(pth, ignore, recursive))
 
 
 @add_filter(["fn", "stem"])
@@ -267,7 +479,7 @@ def filename(pth: PathLike, ignore: list[str] | str = [], recursive: bool = Fals
     Returns:
         The filename of the file
     """
-    return path.basename(_splitexit(pth, ignore, recursive)[0])
+    return _intern(_basename(_splitexit(pth, ignore, recursive)[0]))
 
 
 @add_filter(["fn0", "stem0"])
@@ -287,7 +499,7 @@ def filename0(pth: PathLike, ignore: list[str] | str = [], recursive: bool = Fal
     Returns:
         The filename of the file without the extension
     """
-    return filename(pth, ignore, recursive).split(".")[0]
+    return _intern(filename(pth, ignore, recursive).partition(".")[0])
 
 
 @add_filter("joinpath")
@@ -304,7 +516,7 @@ def joinpaths(*paths: PathLike) -> str:
     Returns:
         The joined path
     """
-    return path.join(*paths)
+    return _join(*paths)
 
 
 @add_filter
@@ -330,7 +542,8 @@ def isdir(pth: PathLike) -> bool:
     Returns:
         True if the path is a directory, False otherwise
     """
-    return path.isdir(pth)
+    st = _stat(pth)
+    return st is not None and S_ISDIR(st.st_mode)
 
 
 @add_filter
@@ -343,7 +556,8 @@ def isfile(pth: PathLike) -> bool:
     Returns:
         True if the path is a file, False otherwise
     """
-    return path.isfile(pth)
+    st = _stat(pth)
+    return st is not None and S_ISREG(st.st_mode)
 
 
 @add_filter
@@ -369,7 +583,23 @@ def exists(pth: PathLike) -> bool:
     Returns:
         True if the path exists, False otherwise
     """
-    return path.exists(pth)
+    return _stat(pth) is not None
+
+
+@add_filter
+def stat(pth: PathLike) -> stat_result | None:
+    """Get the stat of a path, return None if the path does not exist
+
+    Use it to get multiple stat fields of a path with a single syscall, e.g.
+    `{% set st = stat(pth) %}{{st.st_size}} {{st.st_mtime}}`
+
+    Args:
+        pth: The path to the file
+
+    Returns:
+        The stat result of the path, or None
+    """
+    return _stat(pth)
 
 
 @add_filter
@@ -382,11 +612,12 @@ def getsize(pth: PathLike) -> int:
     Returns:
         The size of the file
     """
-    return _neg1_if_error(path.getsize)(pth)
+    st = _stat(pth)
+    return -1 if st is None else st.st_size
 
 
 @add_filter
-def getmtime(pth: PathLike) -> int:
+def getmtime(pth: PathLike) -> float:
     """Get the modification time of a file, return -1 if the file does not exist
 
     Args:
@@ -395,11 +626,12 @@ def getmtime(pth: PathLike) -> int:
     Returns:
         The modification time of the file
     """
-    return _neg1_if_error(path.getmtime)(pth)
+    st = _stat(pth)
+    return -1 if st is None else st.st_mtime
 
 
 @add_filter
-def getctime(pth: PathLike) -> int:
+def getctime(pth: PathLike) -> float:
     """Get the creation time of a file, return -1 if the file does not exist
 
     Args:
@@ -408,11 +640,12 @@ def getctime(pth: PathLike) -> int:
     Returns:
         The creation time of the file
     """
-    return _neg1_if_error(path.getctime)(pth)
+    st = _stat(pth)
+    return -1 if st is None else st.st_ctime
 
 
 @add_filter
-def getatime(pth: PathLike) -> int:
+def getatime(pth: PathLike) -> float:
     """Get the access time of a file, return -1 if the file does not exist
 
     Args:
@@ -421,7 +654,8 @@ def getatime(pth: PathLike) -> int:
     Returns:
         The access time of the file
     """
-    return _neg1_if_error(path.getatime)(pth)
+    st = _stat(pth)
+    return -1 if st is None else st.st_atime
 
 
 @add_filter
@@ -440,14 +674,25 @@ def isempty(
     Returns:
         True if the file is empty, False otherwise
     """
-    if not path.isfile(pth):
+    st = _stat(pth)
+    if st is None or not S_ISREG(st.st_mode):
         return nonfile_as_empty
 
+    if st.st_size == 0:
+        return True
+
     if not ignore_ws:
-        return path.getsize(pth) == 0
+        return False
 
-    with open(pth) as fvar:
-        return fvar.read().strip() == ""
+    # Read in chunks so that we can stop at the first non-whitespace chunk
+    # without loading the whole file
+    with open(pth, "rb") as fvar:
+        while True:
+            chunk = fvar.read(65536)
+            if not chunk:
+                return True
+            if chunk.strip():
+                return False
 
 
 @add_filter
@@ -460,7 +705,9 @@ def quote(var: Any) -> str:
     Returns:
         The quoted string
     """
-    return json.dumps(str(var))
+    if isinstance(var, str) and _QUOTE_SAFE.issuperset(var):
+        return '"' + var + '"'
+    return _json_encode(str(var))
 
 
 @add_filter
@@ -473,6 +720,8 @@ def squote(var: Any) -> str:
     Returns:
         The quoted string
     """
+    if isinstance(var, str) and _QUOTE_SAFE.issuperset(var):
+        return "'" + var + "'"
     return repr(str(var))
 
 
@@ -488,7 +737,7 @@ def json_dumps(var: Any) -> str:
     Returns:
         The json string
     """
-    return json.dumps(var)
+    return _json_encode(var)
 
 
 @add_filter
@@ -529,6 +778,7 @@ def toml(var: Any) -> str:
     Returns:
         The toml string
     """
+    import rtoml
     return rtoml.dumps(var)
 
 
@@ -555,6 +805,9 @@ def toml_loads(tomlstr: str) -> Any:
     Returns:
         The loaded object
     """
+    import rtoml
+    from diot import Diot
+    from simpleconf.caster import cast, null_caster
     return cast(Diot(rtoml.loads(tomlstr)), [null_caster])
 
 
@@ -565,7 +818,8 @@ def config(x: Any, loader: str = None) -> Mapping[str, Any]:
     Args:
         x: The path to the file, dict or string of configurations (json or toml)
         loader: The loader to use, defaults to auto-detect
-            If x is a dict, this argument is ignored
+            If x is a dict, this argument is ignored, and x is returned
+            as is if it is already a Diot
             if x is a string and is not a file path, then x will be loaded as
             a toml string if loader is not specified
             if x is a file path, then x will be loaded according to the file
@@ -574,14 +828,21 @@ def config(x: Any, loader: str = None) -> Mapping[str, Any]:
     Returns:
         The config
     """
+    from diot import Diot
+    if isinstance(x, Diot):
+        return x
+    if isinstance(x, Mapping):
+        return Diot(x)
+
+    from simpleconf import Config
     if not isinstance(x, (Path, str)):  # assume dict
         return Config.load_one(x, loader="dict")
 
     if isinstance(x, str) and not Path(x).is_file():
         if loader == "toml":
-            return Diot(FILTERS["toml_loads"](x))
+            return Diot(toml_loads(x))
         if loader == "json":
-            return Diot(FILTERS["json_loads"](x))
+            return Diot(json_loads(x))
         raise ValueError(f"Unknown loader: {loader}")
 
     return Config.load_one(x, loader=loader)
@@ -597,7 +858,7 @@ def glob(*paths: PathLike) -> List[str]:
     Returns:
         The globbed paths
     """
-    return list(sorted(pyglob(path.join(*paths))))
+    return sorted(_iglob(_join(*paths)))
 
 
 @add_filter
@@ -610,7 +871,11 @@ def glob0(*paths: PathLike) -> str:
     Returns:
         The first globbed path
     """
-    return glob(*paths)[0]
+    pattern = _join(*paths)
+    first = min(_iglob(pattern), default=None)
+    if first is None:
+        raise IndexError(f"No paths matched: {pattern}")
+    return first
 
 
 @add_filter
@@ -667,8 +932,7 @@ def regex_replace(
     Returns:
         The replaced string
     """
-    import re
-    return re.sub(pattern, repl, string, count=count, flags=flags)
+    return _compile_re(pattern, flags).sub(repl, string, count=count)
 
 
 @add_filter
@@ -683,5 +947,22 @@ def slugify(string: str, *args: Any, **kwargs: Any) -> str:
     Returns:
         The slugified string
     """
+    if not args and not kwargs and _SLUG_SIMPLE.issuperset(string):
+        # Plain words, slugify() would just lowercase and join them with "-"
+        return "-".join(string.lower().split())
+
     from slugify import slugify as _slugify
     return _slugify(string, *args, **kwargs)
+
+
+# The filters registered above as attributes, e.g. `F.basename(...)`
+# They are stored on a slotted class, so the lookup never goes through an
+# instance `__dict__`
+F = type(
+    "FiltersNS",
+    (),
+    {
+        "__slots__": (),
+        **{name: staticmethod(func) for name, func in FILTERS.items()},
+    },
+)()
@@ -0,0 +1,21 @@
+import pytest
+
+from pipen_filters import PipenFilters
+
+
+@pytest.fixture(scope="session")
+def sample_files(tmp_path_factory):
+    """A directory with files shared by the read-only tests"""
+    tmp_path = tmp_path_factory.mktemp("sample_files")
+    (tmp_path / "a.txt").touch()
+    (tmp_path / "b.txt").touch()
+    (tmp_path / ".c.txt").touch()
+    (tmp_path / "read").write_text("123")
+    (tmp_path / "lines").write_text("123\n456")
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def pf():
+    """The plugin instance shared by the plugin tests"""
+    return PipenFilters()
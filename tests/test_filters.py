@@ -1,28 +1,39 @@
 import pytest
-from collections import namedtuple
-from pipen_filters.filters import FILTERS
-
-f = namedtuple("f", FILTERS.keys())(*FILTERS.values())
-
-
-# type: ignore [reportUndefinedVariable]
-def test_realpath(tmp_path):
+from pathlib import PureWindowsPath
+from pipen_filters.filters import (
+    F as f,
+    clear_filter_caches,
+    _commonprefix,
+    _compile_re,
+    _splitexit_cached,
+)
+
+
+@pytest.fixture(scope="module")
+def symlink(tmp_path_factory):
+    """A symlink and the file it points to"""
+    tmp_path = tmp_path_factory.mktemp("symlink")
     target = tmp_path / "a"
     source = tmp_path / "b"
-    source.write_text("")
+    source.touch()
     target.symlink_to(source)
+    return target, source
+
+
+def test_realpath(symlink):
+    target, source = symlink
     assert f.realpath(target) == str(source)
 
 
 def test_slugify():
     assert f.slugify("a b") == "a-b"
+    assert f.slugify(" Hello\tWorld 2 ") == "hello-world-2"
+    assert f.slugify("a_b c!") == "a-b-c"
+    assert f.slugify("A b", lowercase=False) == "A-b"
 
 
-def test_readlink(tmp_path):
-    target = tmp_path / "a"
-    source = tmp_path / "b"
-    source.write_text("")
-    target.symlink_to(source)
+def test_readlink(symlink):
+    target, source = symlink
     assert f.readlink(target) == str(source)
 
 
@@ -34,74 +45,151 @@ def test_basename():
     assert f.basename("/a/b/c.txt") == "c.txt"
 
 
+def test_commonprefix_cached():
+    clear_filter_caches()
+    assert f.commonprefix("/a/abc.txt", "/a/abd.txt") == "ab"
+    assert f.commonprefix("/a/abc.txt", "/a/abd.txt") == "ab"
+    assert _commonprefix.cache_info().hits == 1
+
+    a = PureWindowsPath("C:/a/abc.txt")
+    b = PureWindowsPath("C:/a/abd.txt")
+    assert f.commonprefix(a, b, basename_only=False) == "C:\\a\\ab"
+    a = PureWindowsPath("C:/A/abc.txt")
+    b = PureWindowsPath("C:/A/abd.txt")
+    assert f.commonprefix(a, b, basename_only=False) == "C:\\A\\ab"
+
+
+def test_dirnames():
+    assert f.dirnames(["/a/b/c.txt", "/a/d.txt"]) == ["/a/b", "/a"]
+    assert f.dirnames([]) == []
+
+
+def test_basenames():
+    assert f.basenames(["/a/b/c.txt", "/a/d.txt"]) == ["c.txt", "d.txt"]
+    assert f.basenames([]) == []
+
+
 def test_commonprefix():
     assert f.commonprefix("/a/b/abc.txt", "/a/b/abc.png") == "abc."
     assert (
         f.commonprefix("/a/b/abc.txt", "/a/b/abc.png", basename_only=False)
         == "/a/b/abc."
     )
+    assert f.commonprefix("/a/b/abc.txt") == "abc.txt"
+    assert f.commonprefix("/a/b/abc.txt", basename_only=False) == "/a/b/abc.txt"
+
+
+@pytest.mark.parametrize(
+    "pth,kwargs,expected",
+    [
+        ("/a/b.txt", {}, ".txt"),
+        ("/a/b.txt.gz", {"ignore": ".gz"}, ".txt"),
+        ("/a/b.txt.gz", {"ignore": [".gz"]}, ".txt"),
+        ("/a/b.txt.gz", {"ignore": [".gz", "txt"], "recursive": True}, ""),
+        ("/a/b.x.txt.gz", {"ignore": [".gz", "txt"], "recursive": True}, ".x"),
+    ],
+)
+def test_ext(pth, kwargs, expected):
+    assert f.ext(pth, **kwargs) == expected
+    assert f.suffix(pth, **kwargs) == expected
+    assert f.ext0(pth, **kwargs) == expected[1:]
+    assert f.suffix0(pth, **kwargs) == expected[1:]
+
+
+def test_exts():
+    assert f.exts(["/a/b.txt", "/a/c.csv", "/a/d"]) == [".txt", ".csv", ""]
+    assert f.suffixes(["/a/b.txt"]) == [".txt"]
+    assert f.exts(["/a/b.txt.gz", "/a/c.csv"], ignore=".gz") == [".txt", ".csv"]
+    assert f.exts(["/a/b.x.txt.gz"], ignore=[".gz", "txt"], recursive=True) == [".x"]
+
+
+def test_splitexit_cache_keyed_on_exact_path():
+    assert f.prefix(PureWindowsPath("C:/A/b.txt")) == "C:\\A\\b"
+    assert f.prefix(PureWindowsPath("C:/a/B.txt")) == "C:\\a\\B"
+    assert f.ext(PureWindowsPath("C:/a/b.txt")) == ".txt"
+    assert f.ext(PureWindowsPath("C:/a/b.TXT")) == ".TXT"
+
+
+def test_clear_filter_caches():
+    f.ext("/a/b.txt")
+    assert _splitexit_cached.cache_info().currsize > 0
+    clear_filter_caches()
+    assert _splitexit_cached.cache_info().currsize == 0
+    assert f.ext("/a/b.txt") == ".txt"
 
 
-def test_ext():
-    assert f.ext("/a/b.txt") == ".txt"
-    assert f.suffix("/a/b.txt") == ".txt"
-    assert f.ext("/a/b.txt.gz", ignore=".gz") == ".txt"
-    assert f.ext("/a/b.txt.gz", ignore=[".gz"]) == ".txt"
-    assert f.ext("/a/b.txt.gz", ignore=[".gz", "txt"], recursive=True) == ""
-    assert f.ext("/a/b.x.txt.gz", ignore=[".gz", "txt"], recursive=True) == ".x"
-
-
-def test_ext0():
-    assert f.ext0("/a/b.txt") == "txt"
-    assert f.suffix0("/a/b.txt") == "txt"
-    assert f.ext0("/a/b.txt.gz", ignore=".gz") == "txt"
-    assert f.ext0("/a/b.txt.gz", ignore=[".gz"]) == "txt"
-    assert f.ext0("/a/b.txt.gz", ignore=[".gz", "txt"], recursive=True) == ""
-    assert f.ext0("/a/b.x.txt.gz", ignore=[".gz", "txt"], recursive=True) == "x"
-
-
-def test_prefix():
-    assert f.prefix("/a/b.c.txt") == "/a/b.c"
-    assert f.prefix("/a/b.c.txt", ignore=".txt") == "/a/b"
-    assert f.prefix("/a/b.c.txt", ignore=[".txt"]) == "/a/b"
-    assert f.prefix("/a/c.d.e.txt", ignore=[".txt", "e"], recursive=True) == "/a/c"
-    assert f.prefix("/a/c.d.e.txt", ignore=[".txt", "e"], recursive=False) == "/a/c.d"
-
-
-def test_prefix0():
-    assert f.prefix0("/a/b.c.txt") == "/a/b"
-    assert f.prefix0("/a/b.c.txt", ignore=".txt") == "/a/b"
-    assert f.prefix0("/a/b.c.txt", ignore=[".txt"]) == "/a/b"
-    assert f.prefix0("/a/b.c.txt", ignore=[".txt", "c"], recursive=True) == "/a/b"
-    assert f.prefix0("/a/b.c.d.e.txt", ignore=[".txt", "c"], recursive=True) == "/a/b"
-
-
-def test_filename():
-    assert f.filename("/a/b.c.txt") == "b.c"
-    assert f.fn("/a/b.c.txt") == "b.c"
-    assert f.stem("/a/b.c.txt") == "b.c"
-    assert f.filename("/a/b.c.txt", ignore=".txt") == "b"
-    assert f.filename("/a/b.c.txt", ignore=[".txt"]) == "b"
-    assert f.filename("/a/b.c.d.txt", ignore=[".txt", "d"], recursive=True) == "b"
-    assert f.filename("/a/b.c.d.txt", ignore=[".txt", "d"], recursive=False) == "b.c"
-
-
-def test_filename0():
-    assert f.filename0("/a/b.c.txt") == "b"
-    assert f.fn0("/a/b.c.txt") == "b"
-    assert f.stem0("/a/b.c.txt") == "b"
-    assert f.filename0("/a/b.c.txt", ignore=".txt") == "b"
-    assert f.filename0("/a/b.c.txt", ignore=[".txt"]) == "b"
-    assert f.filename0("/a/b.c.txt", ignore=[".txt", "c"], recursive=True) == "b"
-    assert f.filename0("/a/b.c.d.e.txt", ignore=[".txt", "c"], recursive=True) == "b"
+@pytest.mark.parametrize(
+    "pth,kwargs,expected",
+    [
+        ("/a/b.c.txt", {}, "/a/b.c"),
+        ("/a/b.c.txt", {"ignore": ".txt"}, "/a/b"),
+        ("/a/b.c.txt", {"ignore": [".txt"]}, "/a/b"),
+        ("/a/c.d.e.txt", {"ignore": [".txt", "e"], "recursive": True}, "/a/c"),
+        ("/a/c.d.e.txt", {"ignore": [".txt", "e"], "recursive": False}, "/a/c.d"),
+    ],
+)
+def test_prefix(pth, kwargs, expected):
+    assert f.prefix(pth, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "pth,kwargs,expected",
+    [
+        ("/a/b.c.txt", {}, "/a/b"),
+        ("/a/b.c.txt", {"ignore": ".txt"}, "/a/b"),
+        ("/a/b.c.txt", {"ignore": [".txt"]}, "/a/b"),
+        ("/a/b.c.txt", {"ignore": [".txt", "c"], "recursive": True}, "/a/b"),
+        ("/a/b.c.d.e.txt", {"ignore": [".txt", "c"], "recursive": True}, "/a/b"),
+    ],
+)
+def test_prefix0(pth, kwargs, expected):
+    assert f.prefix0(pth, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "pth,kwargs,expected",
+    [
+        ("/a/b.c.txt", {}, "b.c"),
+        ("/a/b.c.txt", {"ignore": ".txt"}, "b"),
+        ("/a/b.c.txt", {"ignore": [".txt"]}, "b"),
+        ("/a/b.c.d.txt", {"ignore": [".txt", "d"], "recursive": True}, "b"),
+        ("/a/b.c.d.txt", {"ignore": [".txt", "d"], "recursive": False}, "b.c"),
+    ],
+)
+def test_filename(pth, kwargs, expected):
+    assert f.filename(pth, **kwargs) == expected
+    assert f.fn(pth, **kwargs) == expected
+    assert f.stem(pth, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "pth,kwargs,expected",
+    [
+        ("/a/b.c.txt", {}, "b"),
+        ("/a/b.c.txt", {"ignore": ".txt"}, "b"),
+        ("/a/b.c.txt", {"ignore": [".txt"]}, "b"),
+        ("/a/b.c.txt", {"ignore": [".txt", "c"], "recursive": True}, "b"),
+        ("/a/b.c.d.e.txt", {"ignore": [".txt", "c"], "recursive": True}, "b"),
+    ],
+)
+def test_filename0(pth, kwargs, expected):
+    assert f.filename0(pth, **kwargs) == expected
+    assert f.fn0(pth, **kwargs) == expected
+    assert f.stem0(pth, **kwargs) == expected
 
 
 def test_quote():
     assert f.quote("1") == '"1"'
+    assert f.quote(1) == '"1"'
+    assert f.quote("a/b.txt") == '"a/b.txt"'
+    assert f.quote('a"b') == '"a\\"b"'
 
 
 def test_squote():
     assert f.squote("1") == "'1'"
+    assert f.squote(1) == "'1'"
+    assert f.squote("a/b.txt") == "'a/b.txt'"
+    assert f.squote("a'b") == '"a\'b"'
 
 
 def test_joinpaths():
@@ -113,6 +201,9 @@ def test_json():
     assert f.json({"a": 1}) == '{"a": 1}'
     assert f.json_dumps({"a": 1}) == '{"a": 1}'
     assert f.json_loads('{"a": 1}') == {"a": 1}
+    assert f.json_loads("1e400") == float("inf")
+    big = 123456789012345678901234567890
+    assert f.json_loads(str(big)) == big
 
 
 def test_toml():
@@ -123,32 +214,35 @@ def test_toml():
     assert f.toml_loads('a = "null"') == {"a": None}
 
 
-def test_read(tmp_path):
-    file = tmp_path / "a"
-    file.write_text("123")
-    assert f.read(file) == "123"
+def test_read(sample_files):
+    assert f.read(sample_files / "read") == "123"
 
 
-def test_readlines(tmp_path):
-    file = tmp_path / "a"
-    file.write_text("123\n456")
-    assert f.readlines(file) == ["123", "456"]
+def test_readlines(sample_files):
+    assert f.readlines(sample_files / "lines") == ["123", "456"]
 
 
-def test_glob(tmp_path):
-    file1 = tmp_path / "a.txt"
-    file2 = tmp_path / "b.txt"
-    file1.write_text("")
-    file2.write_text("")
-    assert list(f.glob(tmp_path, "*.txt")) == [str(file1), str(file2)]
+def test_glob(sample_files):
+    file1 = sample_files / "a.txt"
+    file2 = sample_files / "b.txt"
+    matches = iter(f.glob(sample_files, "*.txt"))
+    assert next(matches) == str(file1)
+    assert next(matches) == str(file2)
+    assert next(matches, None) is None
+    assert f.glob(sample_files, "a.txt") == [str(file1)]
+    assert f.glob(sample_files, "c.txt") == []
+    assert f.glob(sample_files, ".*.txt") == [str(sample_files / ".c.txt")]
+    assert f.glob(sample_files, "nonexist", "*.txt") == []
+    bdir = bytes(sample_files)
+    assert f.glob(bdir, b"*.txt") == [bytes(file1), bytes(file2)]
+    assert f.glob(bdir, b"a.txt") == [bytes(file1)]
+    assert f.glob(sample_files.parent, "sample_files?", "a.txt") == [str(file1)]
 
 
-def test_glob0(tmp_path):
-    file1 = tmp_path / "a.txt"
-    file2 = tmp_path / "b.txt"
-    file1.write_text("")
-    file2.write_text("")
-    assert f.glob0(tmp_path, "*.txt") == str(file1)
+def test_glob0(sample_files):
+    assert f.glob0(sample_files, "*.txt") == str(sample_files / "a.txt")
+    with pytest.raises(IndexError):
+        f.glob0(sample_files, "*.csv")
 
 
 def test_as_path(tmp_path):
@@ -168,6 +262,8 @@ def test_config(tmp_path):
     jfile.write_text('{"a": 1}')
     out = f.json_load(jfile)
     assert out == {"a": 1}
+    assert f.json_load('{"a": 1}') == {"a": 1}
+    assert f.toml_load("a = 1") == {"a": 1}
 
     conf = tmp_path / "config"
     conf.write_text("a = 1")
@@ -184,6 +280,9 @@ def test_config(tmp_path):
         f.config("a = 1")
 
     assert f.config({"a": 1}) == {"a": 1}
+    assert f.config({"a": 1}).a == 1
+    conf = f.config({"a": 1})
+    assert f.config(conf) is conf
 
 
 # path stat
@@ -194,11 +293,8 @@ def test_isdir(tmp_path):
     assert f.isdir(d) is True
 
 
-def test_islink(tmp_path):
-    target = tmp_path / "a"
-    source = tmp_path / "b"
-    source.write_text("")
-    target.symlink_to(source)
+def test_islink(symlink):
+    target, source = symlink
     assert f.islink(target) is True
     assert f.islink(source) is False
 
@@ -220,18 +316,49 @@ def test_isfile_exists_getsize_and_time(tmp_path):
     assert f.getatime(fi) > 0
 
 
+def test_stat(tmp_path):
+    fi = tmp_path / "f"
+    assert f.stat(fi) is None
+    fi.write_text("123")
+    st = f.stat(fi)
+    assert st.st_size == 3
+    assert st.st_mtime == f.getmtime(fi)
+    assert f.isdir(tmp_path) is True
+    assert f.isfile(tmp_path) is False
+    assert f.exists(tmp_path) is True
+    assert f.stat("a\0b") is None
+    assert f.exists("a\0b") is False
+    assert f.isfile("a\0b") is False
+    assert f.isdir("a\0b") is False
+
+
 def test_isempty(tmp_path):
     fi = tmp_path / "f"
     assert f.isempty(fi) is False
     assert f.isempty(fi, nonfile_as_empty=True) is True
+    assert f.isempty("a\0b") is False
+    assert f.isempty("a\0b", nonfile_as_empty=True) is True
 
     fi.write_text("\n")
     assert f.isempty(fi) is True
     assert f.isempty(fi, ignore_ws=False) is False
 
+    fi.write_text(" " * 100000)
+    assert f.isempty(fi) is True
+
+    fi.write_text(" " * 100000 + "a")
+    assert f.isempty(fi) is False
+
 
 def test_regex_replace():
     assert f.regex_replace("a", "a", "b") == "b"
     assert f.regex_replace("a", "a", "b", count=1) == "b"
     assert f.regex_replace("a", "a", "b", flags=0) == "b"
     assert f.regex_replace("a1b2c3", r"(\d+)", "x\\1") == "ax1bx2cx3"
+
+
+def test_regex_replace_cached():
+    clear_filter_caches()
+    assert f.regex_replace("a1", r"\d", "x") == "ax"
+    assert f.regex_replace("b2", r"\d", "y") == "by"
+    assert _compile_re.cache_info().hits == 1
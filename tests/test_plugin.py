@@ -1,12 +1,10 @@
 import pytest
 
 from pipen import Proc, Pipen
-from pipen_filters import PipenFilters
 
 
 @pytest.mark.asyncio
-async def test_plugin():
-    pf = PipenFilters()
+async def test_plugin(pf):
     p = Pipen(plugins=["filters"])
     await pf.on_init.impl(p)
     assert "template_opts" in p.config
@@ -14,6 +12,17 @@ async def test_plugin():
     assert "globals" in p.config.template_opts
 
 
+@pytest.mark.asyncio
+async def test_plugin_keeps_user_filters(pf):
+    p = Pipen(plugins=["filters"])
+    p.config.template_opts = {"filters": {"stem": len}}
+    await pf.on_init.impl(p)
+    assert p.config.template_opts.filters.stem is len
+    assert p.config.template_opts.filters.stem0 is not None
+    assert p.config.template_opts.globals.stem is not len
+
+
+@pytest.mark.slow
 def test_use_as_globals(tmp_path):
     outfile = tmp_path / "test.txt"
 